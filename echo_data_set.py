@@ -1,10 +1,11 @@
 import glob
 import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from xml_converter import XmlConverter
 from single_view_strain_reader import SingleViewStrainReader
-from sklearn.preprocessing import StandardScaler
+from multi_view_strain_reader import MultiViewStrainReader
 from pathlib import Path
 
 
@@ -22,7 +23,7 @@ class EchoDataSet:
                             'Apical Anterior', 'Apical Septal', 'Apical Inferior', 'Apical Lateral', 'Apex']
 
     def __init__(self, input_path='data', output_path='data', output='all_cases.csv', export_file_type='xml',
-                 timings_file=None):
+                 timings_file=None, multi_view=False):
         """
         Process all EchoPAC exports included in the input_path.
         :param input_path: Path to the folder with EchoPAC exports
@@ -31,8 +32,11 @@ class EchoDataSet:
         :param export_file_type: Type of the exports:
             xml: full export with work indices calculated,
             txt: partial export - strain of only one view (4C, 3C or 2C) was exported
+            (one file per view, named <ID>_<view>.txt, can be combined into a single case record)
         :param timings_file: An additional file with aortic valve closure timings, used with single-view export to
         calculate the post-systolic index.
+        :param multi_view: whether the txt exports of the 4C, 2C and 3C views of each patient are combined into a single
+        case record
         """
         self.input_path = input_path
         self.output_path = self._check_directory(output_path)
@@ -41,6 +45,7 @@ class EchoDataSet:
             self.timings_file = os.path.join(self.input_path, timings_file)
         self.files = glob.glob(os.path.join(self.input_path, '*.' + export_file_type))
         self.files.sort()
+        self.multi_view = multi_view
         self.df_all_cases = None
         self.label_col = None
 
@@ -62,6 +67,8 @@ class EchoDataSet:
         df_filename = os.path.join(self.output_path, self.output)
         if os.path.isfile(df_filename):
             self.df_all_cases = pd.read_csv(df_filename, index_col='ID')
+        elif self.multi_view:
+            self.build_data_set_from_multi_view_txt_files()
         else:
             try:
                 self.build_data_set_from_xml_files()
@@ -78,6 +85,17 @@ class EchoDataSet:
 
         return relevant_cols
 
+    @staticmethod
+    def _standardize(df):
+        """
+        Scale the columns to zero mean and unit variance, with population standard deviation (as in sklearn's
+        StandardScaler, without importing it). Constant and nearly constant columns (standard deviation within the
+        floating point error of the values) are only centered, as StandardScaler does.
+        """
+        std = df.std(axis='rows', ddof=0)
+        std = std.where(std > 10 * np.finfo(float).eps * df.abs().max(), 1)
+        return (df - df.mean(axis='rows')) / std
+
     def _group_representatives(self, df, feat):
 
         feature_representatives = {}
@@ -86,9 +104,7 @@ class EchoDataSet:
             print(group)
             print(relevant_cols)
 
-            sc = StandardScaler()
-            scaled_cols = sc.fit_transform(relevant_cols)
-            relevant_cols_scaled = pd.DataFrame(scaled_cols, columns=relevant_cols.columns)
+            relevant_cols_scaled = self._standardize(relevant_cols).reset_index(drop=True)
             relevant_cols_scaled['sum_col'] = relevant_cols_scaled.sum(axis=1)
             feature_representatives[group] = relevant_cols.iloc[np.abs(relevant_cols_scaled['sum_col']).idxmin(), :].name
         return feature_representatives
@@ -243,6 +259,24 @@ class EchoDataSet:
 
         self._save_combined_dataset()
 
+    def build_data_set_from_multi_view_txt_files(self, n_workers=None):
+        """
+        The cases are processed in parallel, by a single pool of n_workers processes (number of CPUs by default). With
+        a single worker, the cases are processed in order, without the overhead of the pool.
+        """
+        n_workers = n_workers or os.cpu_count()
+        timings = pd.read_excel(self.timings_file, header=0, index_col='ID')
+        data_sets = [MultiViewStrainReader(case_id, txt_files, self.timings_file, timings=timings.loc[[case_id]])
+                     for case_id, txt_files in MultiViewStrainReader.group_files(self.files).items()]
+        if n_workers == 1:
+            list_of_dfs = [data_set.combine_dataframes() for data_set in data_sets]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                list_of_dfs = list(executor.map(MultiViewStrainReader.combine_dataframes, data_sets, chunksize=8))
+        self.df_all_cases = pd.concat(list_of_dfs, sort=False)
+
+        self._save_combined_dataset()
+
 
 if __name__ == '__main__':
 
@@ -0,0 +1,272 @@
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+import numpy as np
+from xml_converter import XmlConverter
+from single_view_strain_reader import SingleViewStrainReader
+from multi_view_strain_reader import MultiViewStrainReader
+
+# Golden descriptor tables guard the clinical descriptors (PSI, TTP, max_gls_before_avc, ...) against changes introduced
+# by optimized engines. An engine takes the list of exports and the timings file and returns the descriptor table of
+# all cases, so vectorized, parallel or cached implementations can be checked the same way as the current ones.
+# The golden tables are committed in tests/golden and only rewritten on purpose, with: python golden_outputs.py
+
+REPO_PATH = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_XML = os.path.join(REPO_PATH, 'images', 'Sample_XML.xml')
+GOLDEN_PATH = os.path.join(REPO_PATH, 'tests', 'golden')
+TIMINGS_FILE = 'AVC timings.xlsx'
+VIEW_SUFFIXES = ('4C', '2C', '3C')
+SEED = 0
+N_TXT_CASES = 20
+
+
+# -----Engines----------------------------------------------------------------------------------------------------------
+
+def current_xml_engine(files, timings_file=None):
+    list_of_dfs = []
+    for xml_file in files:
+        conv = XmlConverter(xml_file, os.path.splitext(xml_file)[0] + '.csv')
+        conv.xml2rawcsv()
+        conv.build_separate_tables()
+        list_of_dfs.append(conv.combine_dataframes())
+
+    return pd.concat(list_of_dfs, sort=False)
+
+
+def current_txt_engine(files, timings_file):
+    return pd.concat([SingleViewStrainReader(txt_file, timings_file).combine_dataframes() for txt_file in files])
+
+
+def current_multi_view_txt_engine(files, timings_file):
+    timings = pd.read_excel(timings_file, header=0, index_col='ID')
+    return pd.concat([MultiViewStrainReader(case_id, txt_files, timings_file, timings=timings).combine_dataframes()
+                      for case_id, txt_files in MultiViewStrainReader.group_files(files).items()], sort=False)
+
+
+ENGINES = {'xml': current_xml_engine, 'txt': current_txt_engine, 'multi_view_txt': current_multi_view_txt_engine}
+# Throughput is counted in records (rows of the descriptor table) per second: a case for the xml and multi_view_txt
+# engines, a single view export for the txt engine. The floors are half of the throughput of the current
+# implementations on the fixtures, measured with pandas 1.5.3 (xml: ~6, txt: ~25,
+# multi_view_txt: ~30 records per second), and are meant to be raised along with the optimizations:
+MIN_RECORDS_PER_SECOND = {'xml': 3, 'txt': 12, 'multi_view_txt': 15}
+
+# -----ENDEngines-------------------------------------------------------------------------------------------------------
+
+# -----Fixtures---------------------------------------------------------------------------------------------------------
+
+
+def _segment_curves(rnd, n_pre, n_cycle, n_post):
+    """
+    Six segmental strain curves, equal to zero exactly at the beginning and at the end of the cycle, with peaks of
+    different timing and magnitude.
+    """
+    phase = np.arange(-n_pre, n_cycle + n_post + 1) / n_cycle
+    curves = np.zeros((len(phase), len(SingleViewStrainReader.strain_colors)))
+    for i in range(curves.shape[1]):
+        a, b = rnd.uniform(1.5, 3, size=2)
+        peak = rnd.uniform(8, 25)
+        phase_at_peak = a / (a + b)
+        norm = phase_at_peak ** a * (1 - phase_at_peak) ** b
+        in_cycle = (phase >= 0) & (phase <= 1)
+        curves[in_cycle, i] = -peak * phase[in_cycle] ** a * (1 - phase[in_cycle]) ** b / norm
+        curves[~in_cycle, i] = -0.2 * peak * np.abs(phase[~in_cycle] - (phase[~in_cycle] > 1))
+
+    return curves
+
+
+def _write_txt_export(txt_file, rnd, avc_time):
+    frame_rate = int(rnd.choice([50, 63, 80]))
+    n_pre, n_cycle, n_post = 3, int(np.round(0.8 * frame_rate)), 5
+    times = np.arange(-n_pre, n_cycle + n_post + 1) / frame_rate + n_pre / frame_rate
+    curves = _segment_curves(rnd, n_pre, n_cycle, n_post)
+    ecg = rnd.randint(50, 200, size=len(times))
+
+    with open(txt_file, 'w') as f:
+        f.write('Local Traces SL in %\n')
+        f.write('Number of Frames {}\n'.format(len(times)))
+        f.write('FR= {} Left Marker Time={:.6f} Right Marker Time={:.6f} ES Time={:.6f}\n'.format(
+            frame_rate, times[n_pre], times[n_pre + n_cycle], avc_time))
+        f.write('\t'.join(['Time (s)'] + SingleViewStrainReader.strain_colors + ['GLOBAL', 'ECG : ']) + '\t\n')
+        for t, row, ecg_value in zip(times, curves, ecg):
+            values = ['{:.3f}'.format(t)] + ['{:.6f}'.format(v) for v in row] + ['{:.6f}'.format(row.mean()),
+                                                                                 str(ecg_value)]
+            f.write('\t'.join(values) + '\t\n')
+
+
+def generate_txt_fixtures(fixture_path, n_cases=20, seed=0):
+    """
+    Generate single view .txt exports of all three views, named <ID>_<view>.txt, and the timings file with the
+    aortic valve closure (in ms) of each case.
+    :param fixture_path: Path to the folder where the exports are written
+    :param n_cases: number of generated patients
+    :param seed: seed of the random generator, the same seed always gives the same exports
+    :return: list of the generated .txt files and the path to the timings file
+    """
+    fixture_path = _check_directory(fixture_path)
+    rnd = np.random.RandomState(seed)
+    files, avc_timings = [], {}
+    for case in range(n_cases):
+        case_id = 'GEN{:04d}'.format(case)
+        avc_timings[case_id] = int(rnd.uniform(300, 420))
+        for view in VIEW_SUFFIXES:
+            txt_file = os.path.join(fixture_path, '{}_{}.txt'.format(case_id, view))
+            _write_txt_export(txt_file, rnd, avc_timings[case_id] / 1000.0)
+            files.append(txt_file)
+
+    timings_file = os.path.join(fixture_path, TIMINGS_FILE)
+    df_timings = pd.DataFrame({'AVC': avc_timings})
+    df_timings.index.name = 'ID'
+    df_timings.to_excel(timings_file)
+
+    return sorted(files), timings_file
+
+
+def generate_xml_fixtures(fixture_path):
+    """
+    Copy the sample .xml export (a single case), so that the conversion does not write into the repository.
+    :return: list with the .xml file
+    """
+    xml_file = os.path.join(_check_directory(fixture_path), 'GEN0000.xml')
+    shutil.copyfile(SAMPLE_XML, xml_file)
+
+    return [xml_file]
+
+
+def generate_fixtures(fixture_path):
+    """
+    :return: dictionary {engine name: (exports, timings file)} with the fixtures the golden tables were built from
+    """
+    txt_files, timings_file = generate_txt_fixtures(os.path.join(fixture_path, 'txt'), n_cases=N_TXT_CASES, seed=SEED)
+    xml_files = generate_xml_fixtures(os.path.join(fixture_path, 'xml'))
+
+    return {'xml': (xml_files, None), 'txt': (txt_files, timings_file), 'multi_view_txt': (txt_files, timings_file)}
+
+
+def _check_directory(directory):
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    return directory
+
+# -----ENDFixtures------------------------------------------------------------------------------------------------------
+
+# -----GoldenTables-----------------------------------------------------------------------------------------------------
+
+
+def _golden_file(golden_path, engine_name):
+    return os.path.join(golden_path, '{}_descriptors.csv'.format(engine_name))
+
+
+def run_engine(engine, files, timings_file):
+    """
+    :return: descriptor table of all cases and the throughput in records per second
+    """
+    start = time.perf_counter()
+    df_descriptors = engine(files, timings_file)
+    elapsed = time.perf_counter() - start
+
+    return df_descriptors, len(df_descriptors) / elapsed
+
+
+def store_golden(engine_name, files, timings_file, golden_path=GOLDEN_PATH):
+    """
+    Run the current implementation and save its descriptor table as the golden output.
+    :return: the golden table and the throughput of the current implementation in records per second
+    """
+    df_golden, records_per_second = run_engine(ENGINES[engine_name], files, timings_file)
+    df_golden.to_csv(_golden_file(_check_directory(golden_path), engine_name))
+
+    return df_golden, records_per_second
+
+
+def load_golden(engine_name, golden_path=GOLDEN_PATH):
+    """
+    :raise FileNotFoundError: if the golden table has not been generated
+    """
+    golden_file = _golden_file(golden_path, engine_name)
+    if not os.path.isfile(golden_file):
+        raise FileNotFoundError('No golden table {}; generate it with: python golden_outputs.py'.format(golden_file))
+
+    return pd.read_csv(golden_file, index_col=0)
+
+
+def _as_float(values):
+    """
+    :return: the values as floats, or None for boolean and non-numeric values (some XmlConverter descriptor columns
+    are of object type, with numbers or booleans)
+    """
+    if pd.api.types.is_bool_dtype(values) or values.map(lambda value: isinstance(value, (bool, np.bool_))).any():
+        return None
+    try:
+        return values.values.astype(float)
+    except (TypeError, ValueError):
+        return None
+
+
+def compare_to_golden(df_descriptors, df_golden, rtol=1e-6, atol=1e-9):
+    """
+    Compare a descriptor table with the golden one. Numeric columns are compared with the tolerances, the remaining
+    ones exactly.
+    :raise AssertionError: with the mismatching cases, columns or values
+    """
+    df_descriptors = df_descriptors.copy()
+    df_descriptors.index = df_descriptors.index.astype(str)
+    df_golden = df_golden.copy()
+    df_golden.index = df_golden.index.astype(str)
+
+    missing_cases = df_golden.index.symmetric_difference(df_descriptors.index)
+    if not missing_cases.empty:
+        raise AssertionError('Cases differ from the golden table: {}'.format(list(missing_cases)))
+    missing_columns = df_golden.columns.symmetric_difference(df_descriptors.columns)
+    if not missing_columns.empty:
+        raise AssertionError('Columns differ from the golden table: {}'.format(list(missing_columns)))
+
+    df_descriptors = df_descriptors.loc[df_golden.index, df_golden.columns]
+    mismatches = []
+    for col in df_golden.columns:
+        golden, result = df_golden[col], df_descriptors[col]
+        golden_values, result_values = _as_float(golden), _as_float(result)
+        if golden_values is not None and result_values is not None:
+            equal = np.isclose(result_values, golden_values, rtol=rtol, atol=atol, equal_nan=True)
+        else:
+            equal = golden.astype(str).values == result.astype(str).values
+        mismatches += ['{} {}: {} != {}'.format(case, col, result[case], golden[case])
+                       for case in golden.index[~equal]]
+    if mismatches:
+        raise AssertionError('Descriptors differ from the golden table:\n' + '\n'.join(mismatches))
+
+
+def check_engine(engine, engine_name, files, timings_file, golden_path=GOLDEN_PATH, rtol=1e-6, atol=1e-9,
+                 min_records_per_second=None):
+    """
+    Check an (optimized) engine against the golden output of the current implementation.
+    :param engine: callable(files, timings_file) returning the descriptor table of all cases
+    :param engine_name: xml, txt or multi_view_txt - the golden table to compare with
+    :param min_records_per_second: minimum throughput; MIN_RECORDS_PER_SECOND of the engine_name by default
+    :return: throughput of the engine in records per second
+    :raise AssertionError: if the descriptors differ from the golden table or the engine is too slow
+    """
+    df_golden = load_golden(engine_name, golden_path)
+
+    df_descriptors, records_per_second = run_engine(engine, files, timings_file)
+    compare_to_golden(df_descriptors, df_golden, rtol=rtol, atol=atol)
+
+    if min_records_per_second is None:
+        min_records_per_second = MIN_RECORDS_PER_SECOND[engine_name]
+    if records_per_second < min_records_per_second:
+        raise AssertionError('{}: {:.2f} records per second, expected at least {}'.format(
+            engine_name, records_per_second, min_records_per_second))
+
+    return records_per_second
+
+# -----ENDGoldenTables--------------------------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    # Rewrites the committed golden tables - only when a change of the descriptors is intended:
+    with tempfile.TemporaryDirectory() as path_to_fixtures:
+        for _engine_name, (_files, _timings_file) in generate_fixtures(path_to_fixtures).items():
+            _, _throughput = store_golden(_engine_name, _files, _timings_file)
+            print('{}: {:.2f} records per second'.format(_engine_name, _throughput))
@@ -0,0 +1,138 @@
+import os
+import ntpath
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from single_view_strain_reader import SingleViewStrainReader
+
+
+class MultiViewStrainReader:
+
+    # Suffixes of the single view file names (e.g. ABC0455_4C.txt) and the views of the .xml exports they refer to:
+    VIEWS = {'4C': '4CH', '4CH': '4CH', '2C': '2CH', '2CH': '2CH', '3C': 'APLAX', 'APLAX': 'APLAX'}
+    DESCRIPTORS = ('strain_avc', 'ttp', 'ttp_ratio', 'psi', 'strain_min', 'postsys')
+
+    def __init__(self, case_id, txt_files, timings_file, timings=None):
+        """
+        Combine the single view .txt exports (4C, 2C and 3C) of a patient into a single case record, with the 18
+        segments named and described as in the XmlConverter output.
+        :param case_id: ID of the patient, as in the timings file
+        :param txt_files: dictionary {view: .txt file}, with views 4CH, 2CH and/or APLAX
+        :param timings_file: .xlsx file with timing of the aortic valve closure
+        :param timings: the timings file already read into a data frame, to avoid reading it for every case
+        """
+        self.ID = case_id
+        self.txt_files = txt_files
+        self.timings_file = timings_file
+        self.timings = timings
+
+        self.avc_time = 0
+        self.strain_tables = {}
+        self.descriptor_table = None
+
+    @classmethod
+    def group_files(cls, txt_files):
+        """
+        Group the single view exports by the patient ID prefix of the file names.
+        :param txt_files: list of .txt files, named as <ID>_<view>.txt
+        :return: dictionary {ID: {view: .txt file}}
+        :raise ValueError: if a patient has more than one file of the same view (e.g. <ID>_4C.txt and <ID>_4CH.txt)
+        """
+        cases = {}
+        for txt_file in txt_files:
+            name = str(ntpath.basename(txt_file).split('.')[0])
+            case_id, _, view = name.rpartition('_')
+            if view.upper() not in cls.VIEWS or not case_id:
+                print('Skipping {}: no view (4C, 2C or 3C) in the file name'.format(name))
+                continue
+            views = cases.setdefault(case_id, {})
+            view = cls.VIEWS[view.upper()]
+            if view in views:
+                raise ValueError('Case {} has two {} exports: {} and {}'.format(case_id, view, views[view], txt_file))
+            views[view] = txt_file
+
+        return cases
+
+    # -----StrainDescriptors--------------------------------------------------------------------------------------------
+
+    def _get_avc_time(self):
+        if self.timings is None:
+            self.timings = pd.read_excel(self.timings_file, header=0, index_col='ID')
+        self.avc_time = self.timings.loc[self.ID, 'AVC'] / 1000.0
+
+        return self.avc_time
+
+    def _find_strain_descriptors(self, view):
+        """
+        Segmental descriptors of a view, with the same definitions as in XmlConverter: strain at AVC, time-to-peak
+        (ms), time-to-peak ratio, post-systolic index, minimum strain and post-systolic classification.
+        """
+        df = self.strain_tables[view][SingleViewStrainReader.view_strain_columns[view]]
+        avc_view = df.index[np.argmin(np.abs(df.index.values - self.avc_time))]  # find frame closest to avc
+        strain_min = df.min()
+        ttp = df.idxmin()
+        descriptors = {'strain_avc': df.loc[avc_view],
+                       'ttp': (ttp * 1000).astype(int),
+                       'ttp_ratio': ttp / np.max(df.index.values),
+                       'psi': np.abs((strain_min - df.loc[avc_view]) / strain_min),
+                       'strain_min': strain_min,
+                       'postsys': ttp > avc_view}
+
+        return {descriptor + '_' + segment: descriptors[descriptor][segment]
+                for descriptor in self.DESCRIPTORS for segment in df.columns}
+
+    def _get_gls_ge(self, view):
+        df = self.strain_tables[view]['GLOBAL']
+        avc_view = df.index[np.argmin(np.abs(df.index.values - self.avc_time))]
+        max_global_strain = df.min()
+
+        return {'max_gls_before_avc': df.loc[:avc_view].min(), 'max_gls': max_global_strain,
+                'max_gls_time': df[df == max_global_strain].index[0]}
+
+    # -----ENDStrainDescriptors-----------------------------------------------------------------------------------------
+
+    # -----ReadingAndSaving---------------------------------------------------------------------------------------------
+
+    def combine_dataframes(self):
+        """
+        The global strain descriptors are the averages over the available views. In particular, max_gls_time is the
+        average of the times of the peak global strain in each view - not the time of any actual frame, hence not
+        comparable with the max_gls_time of the .xml exports.
+        :return: a single row data frame with the segmental descriptors of all views, frame rates and global strain
+        values, compatible with the XmlConverter output.
+        """
+        self._get_avc_time()
+        for view, txt_file in self.txt_files.items():
+            reader = SingleViewStrainReader(txt_file, self.timings_file, view=view)
+            self.strain_tables[view] = reader.read_strain_table()
+
+        record = {}
+        global_descriptors = []
+        for view in sorted(self.strain_tables):
+            index = self.strain_tables[view].index.values
+            record['avg_{}_strain_fr'.format(view)] = int(np.round(1 / np.mean(np.diff(index))))
+            record.update(self._find_strain_descriptors(view))
+            global_descriptors.append(self._get_gls_ge(view))
+
+        df_descriptors = pd.DataFrame(record, index=[self.ID])
+        df_descriptors = df_descriptors.sort_index(axis=1)
+        df_gls = pd.DataFrame(global_descriptors).mean().to_frame(self.ID).T
+        df_gls['max_gls_time'] = int(df_gls['max_gls_time'].iloc[0] * 1000)
+        df_descriptors = df_descriptors.merge(df_gls, left_index=True, right_index=True)
+        df_descriptors.index.name = 'ID'
+        self.descriptor_table = df_descriptors
+
+        return df_descriptors
+
+    # -----ENDReadingAndSaving------------------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+
+    path_to_data = os.path.join(str(Path.home()), 'Python', 'data', 'strains')
+    _timings_file = os.path.join(path_to_data, 'AVC timings for the LV 4C v2.xlsx')
+
+    _files = [os.path.join(path_to_data, 'ABC0455_{}.txt'.format(_view)) for _view in ('4C', '2C', '3C')]
+    for _id, _txt_files in MultiViewStrainReader.group_files(_files).items():
+        case = MultiViewStrainReader(_id, _txt_files, timings_file=_timings_file)
+        print(case.combine_dataframes())
@@ -12,16 +12,27 @@ class SingleViewStrainReader:
     strain_colors = ['YELLOW', 'CYAN', 'GREEN', 'MAGENTA', 'BLUE', 'RED']
     strain_columns = ['basal_inferoseptum', 'mid_inferoseptum', 'apical_inferoseptum', 'apical_anterolateral',
                       'mid_anterolateral', 'basal_anterolateral']
-
-    def __init__(self, txt_file, timings_file):
+    # Colors mapped to the segment names of the .xml exports, in the order of strain_colors:
+    view_strain_columns = {'4CH': ['Basal Septal', 'Mid Septal', 'Apical Septal', 'Apical Lateral', 'Mid Lateral',
+                                   'Basal Lateral'],
+                           '2CH': ['Basal Inferior', 'Mid Inferior', 'Apical Inferior', 'Apical Anterior',
+                                   'Mid Anterior', 'Basal Anterior'],
+                           'APLAX': ['Basal Posterior', 'Mid Posterior', 'Apical Posterior', 'Apical Anteroseptal',
+                                     'Mid Anteroseptal', 'Basal Anteroseptal']}
+
+    def __init__(self, txt_file, timings_file, view=None):
         """
         It is possible to export a .txt file from EchoPAC with a single view (4C, 3C or 2C) strain measurements, which
         can be used for analysis.
         :param txt_file: .txt file with strain data
         :param timings_file: .xlsx file with timing of the aortic valve closure
+        :param view: 4CH, 2CH or APLAX - if provided, the colors are mapped to the view-specific segment names of the
+        .xml exports, instead of the default 4C strain_columns
         """
         self.txt_file = txt_file
         self.timings_file = timings_file
+        if view is not None:
+            self.strain_columns = self.view_strain_columns[view]
 
         self.ID = str(ntpath.basename(self.txt_file).split('.')[0])
         self.frame_rate = 0
@@ -40,7 +51,7 @@ class SingleViewStrainReader:
     # -----StrainDescriptors--------------------------------------------------------------------------------------------
 
     def _get_avc_time(self):
-        df = pd.read_excel(self.timings_file, sep=',', header=0, index_col='ID')
+        df = pd.read_excel(self.timings_file, header=0, index_col='ID')
         id = self.ID.split('_')[0]
         self.avc_time = df.loc[id, 'AVC'] / 1000.0
 
@@ -149,6 +160,15 @@ class SingleViewStrainReader:
         self.strain_table = self.strain_table[self.strain_table.index <= r_indexes[1]]
         self.strain_table.index = self.strain_table.index.values - r_indexes[0]
 
+    def read_strain_table(self):
+        """
+        :return: segmental and global strain traces of a single cycle, with time (in seconds) from its beginning as
+        index.
+        """
+        self._txt_to_df()
+
+        return self.strain_table
+
     # -----ENDReadData--------------------------------------------------------------------------------------------------
 
     # -----ReadingAndSaving---------------------------------------------------------------------------------------------
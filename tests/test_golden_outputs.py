@@ -0,0 +1,34 @@
+import pytest
+from golden_outputs import ENGINES, check_engine, compare_to_golden, generate_fixtures, load_golden
+
+
+@pytest.fixture(scope='module')
+def fixtures(tmp_path_factory):
+    return generate_fixtures(str(tmp_path_factory.mktemp('fixtures')))
+
+
+@pytest.mark.parametrize('engine_name', ['xml', 'txt', 'multi_view_txt'])
+def test_current_engine_matches_golden_output(fixtures, engine_name):
+    files, timings_file = fixtures[engine_name]
+    check_engine(ENGINES[engine_name], engine_name, files, timings_file)
+
+
+def test_changed_descriptor_is_reported():
+    df_golden = load_golden('txt')
+    df_changed = df_golden.copy()
+    df_changed.iloc[0, df_changed.columns.get_loc('max_gls_before_avc')] *= 1.01
+
+    with pytest.raises(AssertionError, match='max_gls_before_avc'):
+        compare_to_golden(df_changed, df_golden)
+
+
+def test_compare_to_golden_leaves_golden_table_unchanged():
+    df_golden = load_golden('txt').reset_index(drop=True)
+    compare_to_golden(df_golden, df_golden)
+
+    assert df_golden.index.dtype == int
+
+
+def test_missing_golden_table_is_an_error(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_golden('txt', golden_path=str(tmp_path))
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+REPO_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Measured with pandas 1.5.3: ~1850 ms with sklearn and xmlutils imported at module load, ~550 ms after deferring them
+# (pandas alone: ~480 ms). The budget leaves room for slower machines, but not for sklearn coming back.
+IMPORT_BUDGET_MS = 1000
+
+_IMPORT_SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+import echo_data_set
+print((time.perf_counter() - start) * 1000)
+print(','.join(module for module in ('sklearn', 'xmlutils') if module in sys.modules))
+"""
+
+
+def _import_echo_data_set():
+    output = subprocess.run([sys.executable, '-c', _IMPORT_SCRIPT], cwd=REPO_PATH, check=True, capture_output=True,
+                            text=True).stdout.splitlines()
+    return float(output[0]), output[1] if len(output) > 1 else ''
+
+
+def test_parse_only_import_skips_heavy_dependencies():
+    _, heavy_modules = _import_echo_data_set()
+    assert heavy_modules == ''
+
+
+def test_parse_only_import_within_budget():
+    # The best of a few runs, so that a single slow start of the interpreter does not fail the test:
+    import_time_ms = min(_import_echo_data_set()[0] for _ in range(3))
+    assert import_time_ms < IMPORT_BUDGET_MS
@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+from golden_outputs import generate_txt_fixtures
+from multi_view_strain_reader import MultiViewStrainReader
+
+
+def test_group_files_keeps_full_id_prefix():
+    cases = MultiViewStrainReader.group_files(['data/ABC_01_4C.txt', 'data/ABC_02_4C.txt', 'data/ABC_01_3C.txt'])
+
+    assert cases == {'ABC_01': {'4CH': 'data/ABC_01_4C.txt', 'APLAX': 'data/ABC_01_3C.txt'},
+                     'ABC_02': {'4CH': 'data/ABC_02_4C.txt'}}
+
+
+def test_group_files_rejects_two_exports_of_a_view():
+    with pytest.raises(ValueError):
+        MultiViewStrainReader.group_files(['data/XYZ_4C.txt', 'data/XYZ_4CH.txt'])
+
+
+def test_case_record_reads_back_with_id_index(tmp_path):
+    txt_files, timings_file = generate_txt_fixtures(str(tmp_path), n_cases=1)
+    (case_id, views), = MultiViewStrainReader.group_files(txt_files).items()
+    df_case = MultiViewStrainReader(case_id, views, timings_file).combine_dataframes()
+
+    df_case.to_csv(tmp_path / 'all_cases.csv')
+    df_read = pd.read_csv(tmp_path / 'all_cases.csv', index_col='ID')
+
+    assert list(df_read.index) == [case_id]
+    assert len([col for col in df_read.columns if col.startswith('strain_avc_')]) == 18
@@ -4,7 +4,6 @@ import ntpath
 import pandas as pd
 import numpy as np
 from ntpath import basename
-from xmlutils.xmltable2csv import xmltable2csv
 
 
 class XmlConverter:
@@ -27,8 +26,20 @@ class XmlConverter:
         """
         Convert the xml into a raw csv file.
         """
+        # Imported here, so that the txt-only runs (and the worker processes) do not pay for loading xmlutils:
+        from xmlutils.xmltable2csv import xmltable2csv
+
         converter = xmltable2csv(input_file=self.xml_file, output_file=self.csv_file)
+
+        def _write_buffer(delimiter):
+            # xmlutils keeps the empty cells (<Data/>) as None, the tables are split on empty strings instead:
+            converter.output.write('\n'.join([delimiter.join(cell or '' for cell in row)
+                                              for row in converter.output_buffer]) + '\n')
+            converter.output_buffer = []
+
+        converter._write_buffer = _write_buffer
         converter.convert(tag='Data')
+        converter.output.close()
 
     def build_separate_tables(self):
         """
@@ -208,7 +219,7 @@ class XmlConverter:
             avc_view = df.index[np.argmin(np.abs(df.index.values - avc))]  # find frame closest to avc
             df.loc['strain_avc'] = df.loc[avc_view].values
             for col in df.columns:
-                df.loc['ttp', col] = df[col].idxmin(axis=1)
+                df.loc['ttp', col] = df[col].idxmin()
                 df.loc['ttp_ratio', col] = df.loc['ttp', col] / np.max(indexes)
                 df.loc['psi', col] = np.abs((df[col].min() - df.loc['strain_avc', col])/df[col].min())
             df.loc['strain_min'] = df.min()